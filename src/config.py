@@ -3,13 +3,15 @@ Configuration file for the Nordic Data Pipeline.
 
 This module centralizes all configuration parameters including:
 - Data paths
-- Currency mappings and conversion rates
+- Currency mappings and conversion rates (plus their Polars lookup tables)
 - Feature engineering thresholds
 - ETL pipeline settings
 """
 
 from pathlib import Path
 
+import polars as pl
+
 # =============================================================================
 # DATA PATHS
 # =============================================================================
@@ -28,8 +30,8 @@ CUSTOMERS_FILE = RAW_DATA_DIR / "customers.csv"
 TRANSACTIONS_FILE = RAW_DATA_DIR / "transactions.csv"
 
 # Output file paths
-CUSTOMERS_CLEANED_FILE = PROCESSED_DATA_DIR / "customers_cleaned.csv"
-TRANSACTIONS_CLEANED_FILE = PROCESSED_DATA_DIR / "transactions_cleaned.csv"
+CUSTOMERS_CLEANED_FILE = PROCESSED_DATA_DIR / "customers_cleaned.parquet"
+TRANSACTIONS_CLEANED_FILE = PROCESSED_DATA_DIR / "transactions_cleaned.parquet"
 CUSTOMER_FEATURES_FILE = PROCESSED_DATA_DIR / "customer_features.csv"
 
 
@@ -56,6 +58,32 @@ CONVERSION_RATES = {
     "NOK": 0.087,  # Norwegian Krone
 }
 
+# Low-cardinality columns are encoded as enums after cleaning, so grouping,
+# joining and comparing them works on integer codes instead of strings
+COUNTRY_DTYPE = pl.Enum(sorted(VALID_COUNTRIES))
+# "NA" marks a missing currency (eligible for inference from the customer's
+# country); "UNKNOWN" marks a code without a conversion rate, which is never
+# inferred and keeps a null amount_in_eur (the original code is kept in the
+# cleaned transactions' currency_raw column)
+CURRENCY_DTYPE = pl.Enum([*CONVERSION_RATES, "NA", "UNKNOWN"])
+
+# Lookup tables for the mappings above, built once at import so the pipeline
+# joins against them instead of rebuilding a mapping per call
+COUNTRY_CURRENCY_DF = pl.DataFrame(
+    {
+        "country": list(COUNTRY_CURRENCY_MAP),
+        "currency_from_country": list(COUNTRY_CURRENCY_MAP.values()),
+    },
+    schema={"country": COUNTRY_DTYPE, "currency_from_country": CURRENCY_DTYPE},
+)
+RATES_DF = pl.DataFrame(
+    {
+        "currency": list(CONVERSION_RATES),
+        "rate": list(CONVERSION_RATES.values()),
+    },
+    schema={"currency": CURRENCY_DTYPE, "rate": pl.Float64},
+)
+
 # Whether to infer missing currency from customer country
 INFER_MISSING_CURRENCY = True
 
@@ -2,61 +2,115 @@
 ETL module for cleaning customer and transaction data.
 
 This module provides functions to:
-- Load raw CSV data
+- Convert raw CSV data to Parquet and scan it lazily
 - Clean and standardize customer records
 - Clean and standardize transaction records
 - Validate data quality
 """
 
+import json
+import os
+import tempfile
 from pathlib import Path
 import polars as pl
 
 import config
 
+# Column types of the raw CSV files
+CUSTOMERS_SCHEMA = {
+    "customer_id": pl.Int64,
+    "country": pl.String,
+    "signup_date": pl.String,
+    "email": pl.String,
+}
+TRANSACTIONS_SCHEMA = {
+    "transaction_id": pl.Int64,
+    "customer_id": pl.Int64,
+    "amount": pl.Float64,
+    "currency": pl.String,
+    "timestamp": pl.String,
+    "category": pl.String,
+}
+
+
+def csv_to_parquet(
+    csv_path: Path, parquet_path: Path, schema_overrides: dict
+) -> Path:
+    """Convert a raw CSV file to Parquet, skipping the work if it is up to date.
+
+    The mtime and size of the CSV and the schema overrides used for the
+    conversion are recorded in a <parquet>.source.json file next to the
+    output; the copy is reused only while they all still match, so restoring
+    an older CSV or changing a column type also triggers a conversion. The Parquet file is written to a temporary file
+    and moved into place, so a failed conversion never leaves a partial file.
 
-def load_customers(path: Path) -> pl.DataFrame:
-    """Load customers CSV file.
+    Args:
+        csv_path: Path to the source CSV file
+        parquet_path: Path of the Parquet file to write
+        schema_overrides: Column types to use when parsing the CSV
+
+    Returns:
+        Path to the Parquet file
+    """
+    stamp_path = parquet_path.with_name(parquet_path.name + ".source.json")
+    csv_stat = csv_path.stat()
+    source = {
+        "mtime_ns": csv_stat.st_mtime_ns,
+        "size": csv_stat.st_size,
+        "schema": {name: str(dtype) for name, dtype in schema_overrides.items()},
+    }
+
+    try:
+        recorded = json.loads(stamp_path.read_text())
+    except (OSError, ValueError):
+        recorded = None
+    if recorded == source and parquet_path.exists():
+        return parquet_path
+
+    fd, tmp_name = tempfile.mkstemp(
+        dir=parquet_path.parent, prefix=parquet_path.name, suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        pl.scan_csv(
+            csv_path,
+            schema_overrides=schema_overrides,
+            try_parse_dates=False,
+        ).sink_parquet(tmp_name, compression="zstd", row_group_size=256_000)
+        os.replace(tmp_name, parquet_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    stamp_path.write_text(json.dumps(source))
+    return parquet_path
+
+
+def load_customers(path: Path) -> pl.LazyFrame:
+    """Lazily scan customers Parquet file.
 
     Args:
-        path: Path to customers.csv
+        path: Path to customers.parquet
         path is a Path object, not a string
     Returns:
-        Polars DataFrame including raw customer data
+        Polars LazyFrame over the raw customer data
     """
-    return pl.read_csv(
-        path,
-        schema_overrides={
-            "customer_id": pl.Int64,
-            "country": pl.String,
-            "signup_date": pl.String,
-            "email": pl.String,
-        },
-    )
+    return pl.scan_parquet(path)
 
 
-def load_transactions(path: Path) -> pl.DataFrame:
-    """Load transactions CSV file.
+def load_transactions(path: Path) -> pl.LazyFrame:
+    """Lazily scan transactions Parquet file.
 
     Args:
-        path: Path to transactions.csv
+        path: Path to transactions.parquet
 
     Returns:
-        Raw DataFrame with transaction data
+        Raw LazyFrame with transaction data
     """
-    return pl.read_csv(
-        path,
-        schema_overrides={
-            "transaction_id": pl.Int64,
-            "customer_id": pl.Int64,
-            "amount": pl.Float64,
-            "currency": pl.String,
-            "timestamp": pl.String,
-            "category": pl.String,
-        },
-    )
+    return pl.scan_parquet(path)
 
 
-def clean_customers(df: pl.DataFrame) -> pl.DataFrame:
+def clean_customers(df: pl.LazyFrame) -> pl.LazyFrame:
     """Clean and standardize customer data.
 
     Transformations:
@@ -66,106 +120,89 @@ def clean_customers(df: pl.DataFrame) -> pl.DataFrame:
     - Remove rows with null customer_id
     - Filter to valid Nordic countries
     - Remove duplicate customer_ids (keep first)
+    - Encode country as an Enum
 
     Args:
-        df: Raw customer DataFrame
+        df: Raw customer LazyFrame
 
     Returns:
-        Cleaned customer DataFrame
+        Cleaned customer LazyFrame
     """
-    initial_rows = df.height
-
-    # Check for duplicate customer_ids
-    unique_ids = df["customer_id"].n_unique()
-    if unique_ids < initial_rows:
-        duplicate_count = initial_rows - unique_ids
-        print(f"  WARNING: {duplicate_count} duplicate customer_ids found")
-
-    cleaned = (
-        df.with_columns(
+    return (
+        # Drop null ids before parsing so the string work only touches kept rows
+        df.filter(pl.col("customer_id").is_not_null())
+        .with_columns(
             pl.col("country").str.to_uppercase().alias("country"),
             pl.col("signup_date").str.to_date("%Y-%m-%d").alias("signup_date"),
             pl.col("email").str.to_lowercase().alias("email"),
         )
-        .filter(
-            pl.col("customer_id").is_not_null(),
-            pl.col("country").is_in(config.VALID_COUNTRIES),
-        )
+        .filter(pl.col("country").is_in(config.VALID_COUNTRIES))
+        .with_columns(pl.col("country").cast(config.COUNTRY_DTYPE))
         .unique(subset=["customer_id"], keep="first")
-        .sort("customer_id")
     )
 
-    # Report filtering statistics
-    final_rows = cleaned.height
-    removed_rows = initial_rows - final_rows
-    if removed_rows > 0:
-        removed_pct = (removed_rows / initial_rows) * 100
-        print(f"  Removed {removed_rows} rows ({removed_pct:.1f}% of original)")
-
-    return cleaned
-
 
-def clean_transactions(df: pl.DataFrame) -> pl.DataFrame:
+def clean_transactions(df: pl.LazyFrame) -> pl.LazyFrame:
     """Clean and standardize transaction data.
 
     Transformations:
-    - Standardize currency to uppercase, fill nulls with "NA"
+    - Standardize currency to uppercase, fill nulls/empty with "NA"
+    - Mark currency codes without a conversion rate as "UNKNOWN"; this is lossy
+      for the currency column, so the original code is kept in currency_raw
+      (null for every other row)
     - Standardize category to lowercase, fill nulls/empty with "NA"
+    - Encode currency as an Enum and category as a Categorical
     - Parse timestamp to Datetime type
     - Remove rows with invalid amounts (null or <= 0)
     - Remove rows with null customer_id or transaction_id
     - Remove duplicate transaction_ids (keep first)
 
     Args:
-        df: Raw transaction DataFrame
+        df: Raw transaction LazyFrame
 
     Returns:
-        Cleaned transaction DataFrame
+        Cleaned transaction LazyFrame
     """
-    initial_rows = df.height
-
-    # Check for duplicate transaction_ids
-    unique_ids = df["transaction_id"].n_unique()
-    if unique_ids < initial_rows:
-        duplicate_count = initial_rows - unique_ids
-        print(f"  WARNING: {duplicate_count} duplicate transaction_ids found")
-
-    cleaned = (
-        df.with_columns(
-            # Standardize currency: uppercase, handle nulls
-            pl.when(pl.col("currency").is_null() | (pl.col("currency") == ""))
+    # Normalize the raw currency once; nulls fold into the empty string
+    currency = pl.col("currency").fill_null("").str.to_uppercase()
+
+    return (
+        # Drop invalid rows before parsing so the string work only touches kept rows
+        # (a null amount fails the > 0 comparison and is dropped as well)
+        df.filter(
+            pl.col("transaction_id").is_not_null()
+            & pl.col("customer_id").is_not_null()
+            & (pl.col("amount") > 0)
+        )
+        .with_columns(
+            # Standardize currency: uppercase, nulls and empty strings become "NA",
+            # codes without a conversion rate become "UNKNOWN"
+            pl.when(currency == "")
             .then(pl.lit("NA"))
-            .otherwise(pl.col("currency").str.to_uppercase())
+            .when(currency.is_in(list(config.CONVERSION_RATES)))
+            .then(currency)
+            .otherwise(pl.lit("UNKNOWN"))
+            .cast(config.CURRENCY_DTYPE)
             .alias("currency"),
-            # Standardize category: lowercase, handle nulls and empty strings
-            pl.when(pl.col("category").is_null() | (pl.col("category") == ""))
-            .then(pl.lit("NA"))
-            .otherwise(pl.col("category").str.to_lowercase())
+            # Keep the original code wherever it was mapped to "UNKNOWN"
+            pl.when((currency != "") & ~currency.is_in(list(config.CONVERSION_RATES)))
+            .then(pl.col("currency"))
+            .alias("currency_raw"),
+            # Standardize category: lowercase, nulls and empty strings become "NA"
+            pl.col("category")
+            .fill_null("")
+            .str.to_lowercase()
+            .replace("", "NA")
+            .cast(pl.Categorical)
             .alias("category"),
             # Parse timestamp
             pl.col("timestamp")
             .str.to_datetime("%Y-%m-%d %H:%M:%S")
             .alias("timestamp"),
         )
-        .filter(
-            pl.col("transaction_id").is_not_null(),
-            pl.col("customer_id").is_not_null(),
-            pl.col("amount").is_not_null(),
-            pl.col("amount") > 0,
-        )
         .unique(subset=["transaction_id"], keep="first")
-        .sort("transaction_id")
     )
 
-    # Report filtering statistics
-    final_rows = cleaned.height
-    removed_rows = initial_rows - final_rows
-    if removed_rows > 0:
-        removed_pct = (removed_rows / initial_rows) * 100
-        print(f"  Removed {removed_rows} rows ({removed_pct:.1f}% of original)")
-
-    return cleaned
-
 
 def validate_customers(df: pl.DataFrame) -> dict:
     """Validate cleaned customer data and return quality metrics.
@@ -176,21 +213,33 @@ def validate_customers(df: pl.DataFrame) -> dict:
     Returns:
         Dictionary with validation metrics
     """
-    total_rows = df.height
+    # Compute all scalar metrics in a single pass
+    metrics = (
+        df.lazy()
+        .select(
+            pl.len().alias("total_rows"),
+            pl.col("signup_date").min().alias("min_signup"),
+            pl.col("signup_date").max().alias("max_signup"),
+            pl.col("email").null_count().alias("null_emails"),
+            pl.col("email").n_unique().alias("unique_emails"),
+        )
+        .collect()
+        .row(0, named=True)
+    )
+
+    # The distribution's group keys double as the list of distinct values
+    country_dist = df.group_by("country").len().sort("country")
 
     return {
-        "total_customers": total_rows,
-        "countries": sorted(df["country"].unique().to_list()),
-        "country_distribution": df.group_by("country")
-        .len()
-        .sort("country")
-        .to_dicts(),
+        "total_customers": metrics["total_rows"],
+        "countries": sorted(country_dist["country"].to_list()),
+        "country_distribution": country_dist.to_dicts(),
         "signup_date_range": {
-            "min": str(df["signup_date"].min()),
-            "max": str(df["signup_date"].max()),
+            "min": str(metrics["min_signup"]),
+            "max": str(metrics["max_signup"]),
         },
-        "null_emails": df["email"].null_count(),
-        "duplicate_emails": total_rows - df["email"].n_unique(),
+        "null_emails": metrics["null_emails"],
+        "duplicate_emails": metrics["total_rows"] - metrics["unique_emails"],
     }
 
 
@@ -203,39 +252,63 @@ def validate_transactions(df: pl.DataFrame) -> dict:
     Returns:
         Dictionary with validation metrics
     """
+    # Compute all scalar metrics in a single pass
+    metrics = (
+        df.lazy()
+        .select(
+            pl.len().alias("total_rows"),
+            pl.col("customer_id").n_unique().alias("unique_customers"),
+            pl.col("amount").min().alias("min_amount"),
+            pl.col("amount").max().alias("max_amount"),
+            pl.col("amount").mean().alias("mean_amount"),
+            pl.col("amount").median().alias("median_amount"),
+            pl.col("timestamp").min().alias("min_timestamp"),
+            pl.col("timestamp").max().alias("max_timestamp"),
+            (pl.col("currency") == "NA").sum().alias("na_currency_count"),
+            (pl.col("category") == "NA").sum().alias("na_category_count"),
+        )
+        .collect()
+        .row(0, named=True)
+    )
+
+    # The distributions' group keys double as the lists of distinct values
+    currency_dist = df.group_by("currency").len().sort("len", descending=True)
+    category_dist = df.group_by("category").len().sort("len", descending=True)
+    # The raw codes behind "UNKNOWN" currencies, which the Enum cannot hold
+    unknown_currencies = df["currency_raw"].drop_nulls().unique().sort().to_list()
+
     return {
-        "total_transactions": df.height,
-        "unique_customers": df["customer_id"].n_unique(),
-        "currencies": sorted(df["currency"].unique().to_list()),
-        "currency_distribution": df.group_by("currency")
-        .len()
-        .sort("len", descending=True)
-        .to_dicts(),
-        "categories": sorted(df["category"].unique().to_list()),
-        "category_distribution": df.group_by("category")
-        .len()
-        .sort("len", descending=True)
-        .to_dicts(),
+        "total_transactions": metrics["total_rows"],
+        "unique_customers": metrics["unique_customers"],
+        "currencies": sorted(currency_dist["currency"].to_list()),
+        "currency_distribution": currency_dist.to_dicts(),
+        "unknown_currencies": unknown_currencies,
+        "categories": sorted(category_dist["category"].to_list()),
+        "category_distribution": category_dist.to_dicts(),
         "amount_stats": {
-            "min": round(df["amount"].min(), 2),
-            "max": round(df["amount"].max(), 2),
-            "mean": round(df["amount"].mean(), 2),
-            "median": round(df["amount"].median(), 2),
+            "min": round(metrics["min_amount"], 2),
+            "max": round(metrics["max_amount"], 2),
+            "mean": round(metrics["mean_amount"], 2),
+            "median": round(metrics["median_amount"], 2),
         },
         "timestamp_range": {
-            "min": str(df["timestamp"].min()),
-            "max": str(df["timestamp"].max()),
+            "min": str(metrics["min_timestamp"]),
+            "max": str(metrics["max_timestamp"]),
         },
-        "na_currency_count": df.filter(pl.col("currency") == "NA").height,
-        "na_category_count": df.filter(pl.col("category") == "NA").height,
+        "na_currency_count": metrics["na_currency_count"],
+        "na_category_count": metrics["na_category_count"],
     }
 
 
 def infer_currency_from_country(
-    transactions: pl.DataFrame, customers: pl.DataFrame
-) -> pl.DataFrame:
+    transactions: pl.LazyFrame, customers: pl.LazyFrame
+) -> pl.LazyFrame:
     """Infer currency for transactions with NA currency based on customer country.
 
+    The customer lookup is an inner join, so transactions that reference
+    non-existent customers are dropped in the same pass (see
+    remove_orphan_transactions for the standalone variant).
+
     Maps Nordic countries to their currencies:
     - DK (Denmark) -> DKK
     - SE (Sweden) -> SEK
@@ -243,54 +316,60 @@ def infer_currency_from_country(
     - FI (Finland) -> EUR
 
     Args:
-        transactions: Cleaned transactions DataFrame
-        customers: Cleaned customers DataFrame with country information
+        transactions: Cleaned transactions LazyFrame
+        customers: Cleaned customers LazyFrame with country information
 
     Returns:
-        DataFrame with inferred currencies filled in
+        LazyFrame of transactions with valid customer_id and inferred currencies
     """
-    # Join transactions with customers to get country information
+    # Join transactions with customers to get country information and drop orphans,
+    # then look up each country's currency in the prebuilt table
     transactions_with_country = transactions.join(
         customers.select(["customer_id", "country"]),
         on="customer_id",
+        how="inner",
+        maintain_order="left",
+    ).join(
+        config.COUNTRY_CURRENCY_DF.lazy(),
+        on="country",
         how="left",
+        maintain_order="left",
     )
 
     # Infer currency for NA values based on country
-    result = transactions_with_country.with_columns(
+    return transactions_with_country.with_columns(
         pl.when(pl.col("currency") == "NA")
-        .then(pl.col("country").replace_strict(config.COUNTRY_CURRENCY_MAP, default="NA"))
+        .then(
+            pl.coalesce(
+                pl.col("currency_from_country"),
+                pl.lit("NA", dtype=config.CURRENCY_DTYPE),
+            )
+        )
         .otherwise(pl.col("currency"))
         .alias("currency")
-    ).drop("country")
-
-    na_count_before = transactions.filter(pl.col("currency") == "NA").height
-    na_count_after = result.filter(pl.col("currency") == "NA").height
-    inferred_count = na_count_before - na_count_after
-    
-    if inferred_count > 0:
-        print(f"  Inferred currency for {inferred_count} transactions based on customer country")
-
-    return result
+    ).drop("country", "currency_from_country")
 
 
 def remove_orphan_transactions(
-    transactions: pl.DataFrame, customers: pl.DataFrame
-) -> pl.DataFrame:
+    transactions: pl.LazyFrame, customers: pl.LazyFrame
+) -> pl.LazyFrame:
     """Filter out transactions that reference non-existent customers.
 
     Args:
-        transactions: Cleaned transactions DataFrame
-        customers: Cleaned customers DataFrame
+        transactions: Cleaned transactions LazyFrame
+        customers: Cleaned customers LazyFrame
 
     Returns:
-        DataFrame of transactions with valid customer_id
+        LazyFrame of transactions with valid customer_id
     """
-    valid_customer_ids = customers["customer_id"].unique().to_list()
-    return transactions.filter(pl.col("customer_id").is_in(valid_customer_ids))
+    return transactions.join(
+        customers.select("customer_id").unique(),
+        on="customer_id",
+        how="semi",
+    )
 
 
-def add_amount_in_eur(transactions: pl.DataFrame) -> pl.DataFrame:
+def add_amount_in_eur(transactions: pl.LazyFrame) -> pl.LazyFrame:
     """Add amount_in_eur column by converting amounts using constant exchange rates.
 
     Conversion rates to EUR (approximate):
@@ -300,96 +379,207 @@ def add_amount_in_eur(transactions: pl.DataFrame) -> pl.DataFrame:
     - NOK: 0.088 (Norwegian Krone)
 
     Args:
-        transactions: Cleaned transactions DataFrame with amount and currency columns
+        transactions: Cleaned transactions LazyFrame with amount and currency columns
 
     Returns:
-        DataFrame with added amount_in_eur column
+        LazyFrame with added amount_in_eur column
     """
-    # Add amount_in_eur column using the conversion rates
-    result = transactions.with_columns(
-        (pl.col("amount") * pl.col("currency").replace_strict(config.CONVERSION_RATES, default=None)).round(2)
-        .alias("amount_in_eur")
+    # Look up the conversion rate per currency; "NA" and "UNKNOWN" have no rate
+    # and stay null
+    result = (
+        transactions.join(
+            config.RATES_DF.lazy(), on="currency", how="left", maintain_order="left"
+        )
+        .with_columns((pl.col("amount") * pl.col("rate")).round(2).alias("amount_in_eur"))
+        .drop("rate")
     )
 
     return result
 
+
+def _report_cleaning(
+    id_column: str, initial_rows: int, unique_ids: int, final_rows: int
+) -> None:
+    """Print duplicate and filtering statistics for a cleaning step."""
+    if unique_ids < initial_rows:
+        duplicate_count = initial_rows - unique_ids
+        print(f"  WARNING: {duplicate_count} duplicate {id_column}s found")
+
+    removed_rows = initial_rows - final_rows
+    if removed_rows > 0:
+        removed_pct = (removed_rows / initial_rows) * 100
+        print(f"  Removed {removed_rows} rows ({removed_pct:.1f}% of original)")
+
+
 def run_etl(
     customers_path: Path,
     transactions_path: Path,
     output_dir: Path,
     infer_missing_currency: bool | None = None,
+    verbose: bool = False,
+    persist: bool = True,
+    sort_output: bool = False,
 ) -> tuple[pl.DataFrame, pl.DataFrame]:
     """Run the complete ETL pipeline.
 
+    The raw CSVs are converted to Parquet next to the originals on first use.
+    All steps are built as a lazy query and materialized once at the end, so
+    Polars can push filters and projections down into the Parquet scans.
+
     Args:
         customers_path: Path to raw customers.csv
         transactions_path: Path to raw transactions.csv
         output_dir: Directory for cleaned output files
         infer_missing_currency: If True, infer currency from customer country for NA values
+        verbose: If True, also report how many currencies were inferred; that count
+            needs an extra join, so it is off by default
+        persist: If True, write the cleaned frames to output_dir; library callers
+            that pass the returned frames straight on can skip the write
+        sort_output: If True, sort the cleaned frames by their id column; row order
+            is not needed by any downstream step, so this is off by default
 
     Returns:
-        Tuple of (cleaned_customers, cleaned_transactions)
+        Tuple of (cleaned_customers, cleaned_transactions), with parsed dtypes
+        (dates, datetimes, enums) so downstream steps need no re-parsing
     """
     # Use config default if not explicitly provided
     if infer_missing_currency is None:
         infer_missing_currency = config.INFER_MISSING_CURRENCY
     
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     # Load raw data
     print("Loading raw data...")
-    raw_customers = load_customers(customers_path)
-    raw_transactions = load_transactions(transactions_path)
-    print(f"  Loaded {raw_customers.height} customers")
-    print(f"  Loaded {raw_transactions.height} transactions")
+    customers_parquet = csv_to_parquet(
+        customers_path, customers_path.with_suffix(".parquet"), CUSTOMERS_SCHEMA
+    )
+    transactions_parquet = csv_to_parquet(
+        transactions_path,
+        transactions_path.with_suffix(".parquet"),
+        TRANSACTIONS_SCHEMA,
+    )
+    raw_customers = load_customers(customers_parquet)
+    raw_transactions = load_transactions(transactions_parquet)
 
     # Clean data
-    print("\nCleaning data, first step...")
     clean_cust = clean_customers(raw_customers)
-    clean_txn = clean_transactions(raw_transactions)
+    first_step_txn = clean_transactions(raw_transactions)
+
+    # Per-stage counters, collected as one-row frames and evaluated
+    # together with the cleaned data instead of one collect each
+    stage_counters = [
+        raw_customers.select(
+            pl.len().alias("raw_customers"),
+            pl.col("customer_id").n_unique().alias("raw_customer_ids"),
+        ),
+        raw_transactions.select(
+            pl.len().alias("raw_transactions"),
+            pl.col("transaction_id").n_unique().alias("raw_transaction_ids"),
+        ),
+    ]
+
+    # Cleaning step 2:
+    # Infer missing currency from customer country if flag is set to True
+    if infer_missing_currency:
+        # The customer join also removes orphan transactions
+        if verbose:
+            stage_counters.append(
+                remove_orphan_transactions(first_step_txn, clean_cust).select(
+                    (pl.col("currency") == "NA").sum().alias("na_currency_before")
+                )
+            )
+        clean_txn = infer_currency_from_country(first_step_txn, clean_cust)
+    else:
+        # Remove orphan transactions that reference non-existent customers
+        clean_txn = remove_orphan_transactions(first_step_txn, clean_cust)
+
+    # Add amount_in_eur column so the amounts are comparable across currencies
+    clean_txn = add_amount_in_eur(clean_txn)
+
+    if sort_output:
+        clean_cust = clean_cust.sort("customer_id")
+        clean_txn = clean_txn.sort("transaction_id")
+
+    # Materialize both lazy pipelines (and the counters) in one batch so
+    # Polars can run them in parallel instead of one after the other.
+    # The first-step transactions are collected too: validation reports on
+    # them, before inference fills in NA currencies.
+    clean_cust, clean_txn, first_step_txn, counters = pl.collect_all(
+        [
+            clean_cust,
+            clean_txn,
+            first_step_txn,
+            pl.concat(stage_counters, how="horizontal"),
+        ],
+        engine="streaming",
+    )
+    stats = counters.row(0, named=True)
+
+    print(f"  Loaded {stats['raw_customers']} customers")
+    print(f"  Loaded {stats['raw_transactions']} transactions")
+
+    print("\nCleaning data, first step...")
+    _report_cleaning(
+        "customer_id",
+        stats["raw_customers"],
+        stats["raw_customer_ids"],
+        clean_cust.height,
+    )
+    _report_cleaning(
+        "transaction_id",
+        stats["raw_transactions"],
+        stats["raw_transaction_ids"],
+        first_step_txn.height,
+    )
     print(f"  Cleaned customers: {clean_cust.height} rows")
-    print(f"  Cleaned transactions: {clean_txn.height} rows")
+    print(f"  Cleaned transactions: {first_step_txn.height} rows")
 
     # Validate
     print("\nValidating data...")
     cust_validation = validate_customers(clean_cust)
-    txn_validation = validate_transactions(clean_txn)
+    txn_validation = validate_transactions(first_step_txn)
 
     print(f"  Customer countries: {cust_validation['countries']}")
     print(f"  Transaction currencies: {txn_validation['currencies']}")
     print(f"  Transactions with NA currency: {txn_validation['na_currency_count']}")
+    if txn_validation["unknown_currencies"]:
+        print(
+            f"  WARNING: currency codes without a conversion rate (kept as UNKNOWN): {txn_validation['unknown_currencies']}"
+        )
     print(f"  Transactions with NA category: {txn_validation['na_category_count']}")
 
-    # Cleaning step 2:
-    # Infer missing currency from customer country if flag is set to True
+    # Second step (inference, orphan removal, amount_in_eur) already ran in
+    # the batch above; report what it did
+    print("\nCleaning data, second step:")
     if infer_missing_currency:
-        print("\nCleaning data, second step...")
-        print("  Inferring missing currencies...")
-        clean_txn = infer_currency_from_country(clean_txn, clean_cust)
-
-        txn_validation = validate_transactions(clean_txn)
-        print(f"  Number of transactions with NA currency after inference: {txn_validation['na_currency_count']}")
-
-    # Remove orphan transactions that reference non-existent customers
-    clean_txn = remove_orphan_transactions(clean_txn, clean_cust)
-    if clean_txn.height < raw_transactions.height:
+        na_count_after = clean_txn.select((pl.col("currency") == "NA").sum()).item()
+        if verbose:
+            inferred_count = stats["na_currency_before"] - na_count_after
+            if inferred_count > 0:
+                print(f"  Inferred currency for {inferred_count} transactions based on customer country")
+        print(f"  Number of transactions with NA currency after inference: {na_count_after}")
+
+    if clean_txn.height < stats["raw_transactions"]:
         print(
-            f"  WARNING: {raw_transactions.height - clean_txn.height} transactions reference non-existent customers. These transactions have been removed."
+            f"  WARNING: {stats['raw_transactions'] - clean_txn.height} transactions reference non-existent customers. These transactions have been removed."
         )
-
-    # Add amount_in_eur column so the amounts are comparable across currencies
-    print("\nAdding amount_in_eur column to transactions...")
-    clean_txn = add_amount_in_eur(clean_txn)
-
-    # Save cleaned data as CSV
-    print("\nSaving cleaned data...")
-    customers_output = output_dir / "customers_cleaned.csv"
-    transactions_output = output_dir / "transactions_cleaned.csv"
-
-    clean_cust.write_csv(customers_output)
-    clean_txn.write_csv(transactions_output)
-    print(f"  Saved: {customers_output}")
-    print(f"  Saved: {transactions_output}")
+    print("  Added amount_in_eur column to transactions")
+
+    # Save cleaned data as Parquet (dtypes survive for a standalone feature run)
+    if persist:
+        print("\nSaving cleaned data...")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        customers_output = output_dir / "customers_cleaned.parquet"
+        transactions_output = output_dir / "transactions_cleaned.parquet"
+
+        # Row-group statistics let later scans skip row groups on predicates
+        for frame, output in (
+            (clean_cust, customers_output),
+            (clean_txn, transactions_output),
+        ):
+            frame.write_parquet(
+                output, compression="zstd", row_group_size=256_000, statistics=True
+            )
+        print(f"  Saved: {customers_output}")
+        print(f"  Saved: {transactions_output}")
 
     return clean_cust, clean_txn
 
@@ -399,4 +589,5 @@ if __name__ == "__main__":
         customers_path=config.CUSTOMERS_FILE,
         transactions_path=config.TRANSACTIONS_FILE,
         output_dir=config.PROCESSED_DATA_DIR,
+        verbose=True,
     )
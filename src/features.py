@@ -14,80 +14,99 @@ import polars as pl
 
 import config
 
+# Columns each input must provide; scans project to these so Parquet readers
+# skip the rest
+TRANSACTION_COLUMNS = [
+    "customer_id",
+    "transaction_id",
+    "amount_in_eur",
+    "timestamp",
+    "category",
+    "currency",
+]
+CUSTOMER_COLUMNS = ["customer_id", "country", "signup_date", "email"]
+
 
 def compute_rfm_features(
-    transactions: pl.DataFrame,
+    transactions: pl.LazyFrame,
     reference_date: date | None = None,
-) -> pl.DataFrame:
+) -> pl.LazyFrame:
     """Compute RFM (Recency, Frequency, Monetary) features per customer.
 
+    category and currency are expected in the Categorical/Enum dtypes produced
+    by the ETL, so the per-customer mode() hashes integer codes, not strings.
+
     Args:
-        transactions: Cleaned transactions DataFrame
+        transactions: Cleaned transactions LazyFrame
         reference_date: Date to calculate recency from (defaults to max transaction date)
 
     Returns:
-        DataFrame with one row per customer and RFM features
+        LazyFrame with one row per customer and RFM features
     """
-    # Use max transaction date as reference if not provided
+    # Use max transaction date as reference if not provided; the latest
+    # last_transaction_date equals the max timestamp, so it stays in the plan
     if reference_date is None:
-        reference_date = transactions["timestamp"].max().date()
+        reference = pl.col("last_transaction_date").max().dt.date()
+    else:
+        reference = pl.lit(reference_date)
     
-    # Calculate interevent times (time between consecutive transactions) per customer
-    transactions_sorted = transactions.sort(["customer_id", "timestamp"])
-    interevent_stats = (
-        transactions_sorted
+    # The sort itself flags customer_id as sorted for the group_by. Do not add
+    # set_sorted() on top: the optimizer drops this sort when a query only
+    # needs order-independent columns, and the flag would then be wrong
+    rfm_added = (
+        transactions.sort(["customer_id", "timestamp"])
         .with_columns(
-            # Calculate difference from previous transaction timestamp for same customer
-            (pl.col("timestamp") - pl.col("timestamp").shift(1).over("customer_id"))
-            .dt.total_days()
+            # Interevent times (time between consecutive transactions) in one
+            # vectorized diff over the sorted frame; a diff inside agg runs per
+            # group. Each customer's first transaction has no predecessor (null)
+            pl.when(pl.col("customer_id") == pl.col("customer_id").shift())
+            .then(pl.col("timestamp").diff().dt.total_days())
             .alias("interevent_days")
         )
-        .filter(pl.col("interevent_days").is_not_null())  # Remove first transaction per customer
-        .group_by("customer_id")
+        .group_by("customer_id", maintain_order=True)
         .agg(
+            # === Monetary Features ===
+            pl.col("amount_in_eur").sum().round(2).alias("total_spend"),
+            pl.col("amount_in_eur").mean().round(2).alias("avg_transaction_amount"),
+            pl.col("amount_in_eur").std().round(2).alias("std_transaction_amount"),
+            pl.col("amount_in_eur").min().alias("min_transaction_amount"),
+            pl.col("amount_in_eur").max().alias("max_transaction_amount"),
+            # === Frequency Features ===
+            pl.col("transaction_id").count().alias("transaction_count"),
+            # === Recency Features ===
+            pl.col("timestamp").max().alias("last_transaction_date"),
+            pl.col("timestamp").min().alias("first_transaction_date"),
+            # === Category Preferences ===
+            pl.col("category").mode().first().alias("preferred_category"),
+            # === Currency (most used) ===
+            pl.col("currency").mode().first().alias("preferred_currency"),
+            # === Interevent statistics ===
             pl.col("interevent_days").mean().alias("mean_interevent_days"),
             pl.col("interevent_days").std().alias("std_interevent_days"),
         )
-    )
-    
-    rfm_added = transactions.group_by("customer_id").agg(
-        # === Monetary Features ===
-        pl.col("amount_in_eur").sum().round(2).alias("total_spend"),
-        pl.col("amount_in_eur").mean().round(2).alias("avg_transaction_amount"),
-        pl.col("amount_in_eur").std().round(2).alias("std_transaction_amount"),
-        pl.col("amount_in_eur").min().alias("min_transaction_amount"),
-        pl.col("amount_in_eur").max().alias("max_transaction_amount"),
-        # === Frequency Features ===
-        pl.col("transaction_id").count().alias("transaction_count"),
-        # === Recency Features ===
-        pl.col("timestamp").max().alias("last_transaction_date"),
-        pl.col("timestamp").min().alias("first_transaction_date"),
-        # === Category Preferences ===
-        pl.col("category").mode().first().alias("preferred_category"),
-        # === Currency (most used) ===
-        pl.col("currency").mode().first().alias("preferred_currency"),
-    ).with_columns(
-        # Calculate days since last transaction
-        (pl.lit(reference_date) - pl.col("last_transaction_date").dt.date())
-        .dt.total_days()
-        .alias("days_since_last_transaction"),
-        # Calculate customer tenure (days between first and last transaction)
-        (
-            pl.col("last_transaction_date").dt.date()
-            - pl.col("first_transaction_date").dt.date()
+        .with_columns(
+            # Calculate days since last transaction
+            (reference - pl.col("last_transaction_date").dt.date())
+            .dt.total_days()
+            .alias("days_since_last_transaction"),
+            # Calculate customer tenure (days between first and last transaction)
+            (
+                pl.col("last_transaction_date").dt.date()
+                - pl.col("first_transaction_date").dt.date()
+            )
+            .dt.total_days()
+            .alias("customer_tenure_days"),
         )
-        .dt.total_days()
-        .alias("customer_tenure_days"),
-    ).join(interevent_stats, on="customer_id", how="left")
+    )
     
     return rfm_added
 
 
 def add_customer_flags(
-    features: pl.DataFrame,
+    features: pl.LazyFrame,
     high_value_percentile: float | None = None,
     churn_days: int | None = None,
-) -> pl.DataFrame:
+) -> pl.LazyFrame:
     """Add business flags to customer features.
 
     Flags added:
@@ -97,25 +116,25 @@ def add_customer_flags(
     - has_single_transaction: Customer made only one transaction
 
     Args:
-        features: DataFrame with RFM features
+        features: LazyFrame with RFM features
         high_value_percentile: Percentile threshold for high-value (default from config)
         churn_days: Days of inactivity to consider churning (default from config)
 
     Returns:
-        DataFrame with additional flag columns
+        LazyFrame with additional flag columns
     """
     # Use config defaults if not explicitly provided
     if high_value_percentile is None:
         high_value_percentile = config.HIGH_VALUE_PERCENTILE
     if churn_days is None:
         churn_days = config.CHURN_DAYS
-    
-    # Calculate high-value threshold
-    high_value_threshold = features["total_spend"].quantile(high_value_percentile)
 
     return features.with_columns(
-        # High value: top percentile by spend
-        (pl.col("total_spend") >= high_value_threshold).alias("is_high_value"),
+        # High value: top percentile by spend (threshold computed within the plan)
+        (
+            pl.col("total_spend")
+            >= pl.col("total_spend").quantile(high_value_percentile)
+        ).alias("is_high_value"),
         # Churning: no activity in N days
         (pl.col("days_since_last_transaction") >= churn_days).alias("is_churning"),
         # Churning (z-score based): days since last transaction > mean + CHURN_Z_SCORE_THRESHOLD*std of interevent times
@@ -127,20 +146,20 @@ def add_customer_flags(
 
 
 def enrich_with_customer_data(
-    features: pl.DataFrame,
-    customers: pl.DataFrame,
-) -> pl.DataFrame:
+    features: pl.LazyFrame,
+    customers: pl.LazyFrame,
+) -> pl.LazyFrame:
     """Join customer features with customer master data.
 
     Args:
-        features: DataFrame with customer features and flags
-        customers: Cleaned customers DataFrame
+        features: LazyFrame with customer features and flags
+        customers: Cleaned customers LazyFrame
 
     Returns:
-        Enriched DataFrame with customer attributes
+        Enriched LazyFrame with customer attributes
     """
     return features.join(
-        customers.select(["customer_id", "country", "signup_date", "email"]),
+        customers.select(CUSTOMER_COLUMNS),
         on="customer_id",
         how="left",
     )
@@ -155,35 +174,51 @@ def compute_feature_summary(features: pl.DataFrame) -> dict:
     Returns:
         Dictionary with summary statistics
     """
+    # Compute all counters and statistics in a single pass
+    metrics = features.select(
+        pl.len().alias("total_customers"),
+        pl.col("is_high_value").sum().alias("high_value_customers"),
+        pl.col("is_churning").sum().alias("churning_customers"),
+        pl.col("is_churning_2").sum().alias("churning_customers_based_on_z_score"),
+        pl.col("has_single_transaction").sum().alias("single_transaction_customers"),
+        pl.col("total_spend").min().alias("min_total_spend"),
+        pl.col("total_spend").max().alias("max_total_spend"),
+        pl.col("total_spend").mean().alias("mean_total_spend"),
+        pl.col("total_spend").median().alias("median_total_spend"),
+        pl.col("transaction_count").min().alias("min_transaction_count"),
+        pl.col("transaction_count").max().alias("max_transaction_count"),
+        pl.col("transaction_count").mean().alias("mean_transaction_count"),
+        pl.col("transaction_count").median().alias("median_transaction_count"),
+        pl.col("days_since_last_transaction").mean().alias("avg_days_since_last"),
+    ).row(0, named=True)
+
     return {
-        "total_customers": features.height,
-        "high_value_customers": features.filter(pl.col("is_high_value")).height,
-        "churning_customers": features.filter(pl.col("is_churning")).height,
-        "churning_customers_based_on_z_score": features.filter(pl.col("is_churning_2")).height,
-        "single_transaction_customers": features.filter(
-            pl.col("has_single_transaction")
-        ).height,
+        "total_customers": metrics["total_customers"],
+        "high_value_customers": metrics["high_value_customers"],
+        "churning_customers": metrics["churning_customers"],
+        "churning_customers_based_on_z_score": metrics[
+            "churning_customers_based_on_z_score"
+        ],
+        "single_transaction_customers": metrics["single_transaction_customers"],
         "total_spend_stats": {
-            "min": round(features["total_spend"].min(), 2),
-            "max": round(features["total_spend"].max(), 2),
-            "mean": round(features["total_spend"].mean(), 2),
-            "median": round(features["total_spend"].median(), 2),
+            "min": round(metrics["min_total_spend"], 2),
+            "max": round(metrics["max_total_spend"], 2),
+            "mean": round(metrics["mean_total_spend"], 2),
+            "median": round(metrics["median_total_spend"], 2),
         },
         "transaction_count_stats": {
-            "min": features["transaction_count"].min(),
-            "max": features["transaction_count"].max(),
-            "mean": round(features["transaction_count"].mean(), 2),
-            "median": features["transaction_count"].median(),
+            "min": metrics["min_transaction_count"],
+            "max": metrics["max_transaction_count"],
+            "mean": round(metrics["mean_transaction_count"], 2),
+            "median": metrics["median_transaction_count"],
         },
-        "avg_days_since_last_transaction": round(
-            features["days_since_last_transaction"].mean(), 1
-        ),
+        "avg_days_since_last_transaction": round(metrics["avg_days_since_last"], 1),
     }
 
 
 def run_feature_engineering(
-    customers: pl.DataFrame,
-    transactions: pl.DataFrame,
+    customers: pl.DataFrame | pl.LazyFrame,
+    transactions: pl.DataFrame | pl.LazyFrame,
     output_dir: Path,
     reference_date: date | None = None,
     high_value_percentile: float | None = None,
@@ -191,9 +226,11 @@ def run_feature_engineering(
 ) -> pl.DataFrame:
     """Run the complete feature engineering pipeline.
 
+    The feature steps are chained lazily and collected once before the summary.
+
     Args:
-        customers: Cleaned customers DataFrame
-        transactions: Cleaned transactions DataFrame
+        customers: Cleaned customers DataFrame or LazyFrame
+        transactions: Cleaned transactions DataFrame or LazyFrame
         output_dir: Directory for output files
         reference_date: Date for recency calculation (defaults to max transaction date)
         high_value_percentile: Percentile for high-value flag (default from config)
@@ -211,14 +248,13 @@ def run_feature_engineering(
     output_dir.mkdir(parents=True, exist_ok=True)
 
     print("Computing RFM features...")
-    features = compute_rfm_features(transactions, reference_date)
-    print(f"  Computed features for {features.height} customers")
+    features = compute_rfm_features(transactions.lazy(), reference_date)
 
     print("\nAdding business flags...")
     features = add_customer_flags(features, high_value_percentile, churn_days)
 
     print("\nEnriching with customer data...")
-    features = enrich_with_customer_data(features, customers)
+    features = enrich_with_customer_data(features, customers.lazy())
 
     # Reorder columns for better readability
     column_order = [
@@ -252,7 +288,8 @@ def run_feature_engineering(
         "is_churning_2",
         "has_single_transaction",
     ]
-    features = features.select(column_order)
+    features = features.select(column_order).collect()
+    print(f"\nComputed features for {features.height} customers")
 
     # Print summary
     print("\nFeature summary:")
@@ -278,10 +315,9 @@ def run_feature_engineering(
 if __name__ == "__main__":
     # Load cleaned data
     print("Loading cleaned data...")
-    customers = pl.read_csv(config.CUSTOMERS_CLEANED_FILE)
-    transactions = pl.read_csv(
-        config.TRANSACTIONS_CLEANED_FILE,
-        try_parse_dates=True,
+    customers = pl.scan_parquet(config.CUSTOMERS_CLEANED_FILE).select(CUSTOMER_COLUMNS)
+    transactions = pl.scan_parquet(config.TRANSACTIONS_CLEANED_FILE).select(
+        TRANSACTION_COLUMNS
     )
 
     # Run feature engineering
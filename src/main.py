@@ -31,7 +31,8 @@ def main() -> None:
         output_dir=config.PROCESSED_DATA_DIR,
     )
 
-    # Step 2: Feature Engineering
+    # Step 2: Feature Engineering (reuses the in-memory frames from step 1,
+    # so nothing is read back from disk)
     print("\n" + "=" * 60)
     print("STEP 2: FEATURE ENGINEERING")
     print("=" * 60)
@@ -47,8 +48,8 @@ def main() -> None:
     print("PIPELINE COMPLETE")
     print("=" * 60)
     print(f"\nOutput files in: {config.PROCESSED_DATA_DIR}")
-    print("  - customers_cleaned.csv")
-    print("  - transactions_cleaned.csv")
+    print("  - customers_cleaned.parquet")
+    print("  - transactions_cleaned.parquet")
     print("  - customer_features.csv")
 
 
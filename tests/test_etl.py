@@ -0,0 +1,147 @@
+"""Unit tests for the ETL module."""
+
+import os
+
+import polars as pl
+import pytest
+
+from etl import (
+    CUSTOMERS_SCHEMA,
+    TRANSACTIONS_SCHEMA,
+    add_amount_in_eur,
+    clean_customers,
+    clean_transactions,
+    csv_to_parquet,
+    infer_currency_from_country,
+    validate_transactions,
+)
+
+CUSTOMERS_HEADER = "customer_id,country,signup_date,email\n"
+
+
+def make_customers(rows: list[dict]) -> pl.LazyFrame:
+    """Build a raw customers LazyFrame with the loader's schema."""
+    return pl.LazyFrame(rows, schema=CUSTOMERS_SCHEMA)
+
+
+def make_transactions(rows: list[dict]) -> pl.LazyFrame:
+    """Build a raw transactions LazyFrame with the loader's schema."""
+    return pl.LazyFrame(rows, schema=TRANSACTIONS_SCHEMA)
+
+
+def test_unknown_currency_is_not_inferred_or_converted():
+    """Codes without a rate stay out of inference and keep a null amount_in_eur."""
+    customers = clean_customers(
+        make_customers(
+            [
+                {
+                    "customer_id": 1,
+                    "country": "dk",
+                    "signup_date": "2022-01-01",
+                    "email": "a@example.com",
+                }
+            ]
+        )
+    )
+    transactions = clean_transactions(
+        make_transactions(
+            [
+                {"transaction_id": 1, "currency": "usd"},
+                {"transaction_id": 2, "currency": None},
+                {"transaction_id": 3, "currency": ""},
+                {"transaction_id": 4, "currency": "eur"},
+            ]
+        ).with_columns(
+            customer_id=pl.lit(1, dtype=pl.Int64),
+            amount=pl.lit(100.0),
+            timestamp=pl.lit("2020-01-01 00:00:00"),
+            category=pl.lit("food"),
+        )
+    )
+
+    result = (
+        add_amount_in_eur(infer_currency_from_country(transactions, customers))
+        .select(
+            "transaction_id",
+            pl.col("currency").cast(pl.String),
+            "currency_raw",
+            "amount_in_eur",
+        )
+        .collect()
+        .sort("transaction_id")
+    )
+
+    assert result.rows() == [
+        (1, "UNKNOWN", "usd", None),
+        (2, "DKK", None, 13.4),
+        (3, "DKK", None, 13.4),
+        (4, "EUR", None, 100.0),
+    ]
+
+
+def test_validation_lists_unknown_currency_codes():
+    """Validation reports the original codes that were mapped to UNKNOWN."""
+    transactions = clean_transactions(
+        make_transactions(
+            [
+                {"transaction_id": 1, "currency": "USD"},
+                {"transaction_id": 2, "currency": "gbp"},
+                {"transaction_id": 3, "currency": "USD"},
+                {"transaction_id": 4, "currency": "SEK"},
+                {"transaction_id": 5, "currency": None},
+            ]
+        ).with_columns(
+            customer_id=pl.lit(1, dtype=pl.Int64),
+            amount=pl.lit(100.0),
+            timestamp=pl.lit("2020-01-01 00:00:00"),
+            category=pl.lit("food"),
+        )
+    ).collect()
+
+    validation = validate_transactions(transactions)
+
+    assert validation["currencies"] == ["NA", "SEK", "UNKNOWN"]
+    assert validation["unknown_currencies"] == ["USD", "gbp"]
+
+
+def test_csv_to_parquet_failure_leaves_no_partial_file(tmp_path):
+    """A failed conversion leaves nothing behind and a fixed CSV converts."""
+    csv_path = tmp_path / "customers.csv"
+    parquet_path = tmp_path / "customers.parquet"
+    csv_path.write_text(CUSTOMERS_HEADER + "not-an-id,DK,2022-01-01,a@example.com\n")
+
+    with pytest.raises(pl.exceptions.PolarsError):
+        csv_to_parquet(csv_path, parquet_path, CUSTOMERS_SCHEMA)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["customers.csv"]
+
+    csv_path.write_text(CUSTOMERS_HEADER + "1,DK,2022-01-01,a@example.com\n")
+    csv_to_parquet(csv_path, parquet_path, CUSTOMERS_SCHEMA)
+    assert pl.read_parquet(parquet_path)["customer_id"].to_list() == [1]
+
+
+def test_csv_to_parquet_reconverts_restored_older_csv(tmp_path):
+    """Restoring an older CSV with its original mtime still refreshes the copy."""
+    csv_path = tmp_path / "customers.csv"
+    parquet_path = tmp_path / "customers.parquet"
+    csv_path.write_text(CUSTOMERS_HEADER + "1,DK,2022-01-01,a@example.com\n")
+    csv_to_parquet(csv_path, parquet_path, CUSTOMERS_SCHEMA)
+
+    # Simulate `cp -p` of an older file: new content, mtime older than the copy
+    csv_path.write_text(CUSTOMERS_HEADER + "2,SE,2022-01-01,b@example.com\n")
+    os.utime(csv_path, ns=(1_000_000_000, 1_000_000_000))
+    csv_to_parquet(csv_path, parquet_path, CUSTOMERS_SCHEMA)
+
+    assert pl.read_parquet(parquet_path)["customer_id"].to_list() == [2]
+
+
+def test_csv_to_parquet_reconverts_on_schema_change(tmp_path):
+    """Changing the schema overrides refreshes a copy of an unchanged CSV."""
+    csv_path = tmp_path / "customers.csv"
+    parquet_path = tmp_path / "customers.parquet"
+    csv_path.write_text(CUSTOMERS_HEADER + "1,DK,2022-01-01,a@example.com\n")
+    csv_to_parquet(csv_path, parquet_path, CUSTOMERS_SCHEMA)
+
+    schema = {**CUSTOMERS_SCHEMA, "customer_id": pl.String}
+    csv_to_parquet(csv_path, parquet_path, schema)
+
+    assert pl.read_parquet(parquet_path).schema["customer_id"] == pl.String
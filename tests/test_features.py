@@ -0,0 +1,72 @@
+"""Unit tests for the feature engineering module."""
+
+from datetime import datetime
+
+import polars as pl
+import pytest
+
+from features import compute_rfm_features
+
+
+def make_transactions(rows: list[tuple[int, datetime]]) -> pl.LazyFrame:
+    """Build a cleaned transactions LazyFrame from (customer_id, timestamp) pairs."""
+    return pl.LazyFrame(
+        {
+            "customer_id": [customer_id for customer_id, _ in rows],
+            "timestamp": [timestamp for _, timestamp in rows],
+        }
+    ).with_columns(
+        transaction_id=pl.int_range(pl.len()),
+        amount_in_eur=pl.lit(10.0),
+        category=pl.lit("food"),
+        currency=pl.lit("EUR"),
+    )
+
+
+def test_interevent_stats_match_per_customer_shift():
+    """Interevent mean/std match the shift().over() computation on unsorted input."""
+    transactions = make_transactions(
+        [
+            (3, datetime(2024, 1, 9)),
+            (2, datetime(2024, 1, 4)),
+            (3, datetime(2024, 1, 1)),
+            (1, datetime(2024, 1, 5)),
+            (3, datetime(2024, 1, 4)),
+            (2, datetime(2024, 1, 1)),
+            (3, datetime(2024, 1, 2)),
+        ]
+    )
+
+    # Reference: previous timestamp per customer via shift().over()
+    expected = (
+        transactions.sort(["customer_id", "timestamp"])
+        .with_columns(
+            (pl.col("timestamp") - pl.col("timestamp").shift(1).over("customer_id"))
+            .dt.total_days()
+            .alias("interevent_days")
+        )
+        .filter(pl.col("interevent_days").is_not_null())
+        .group_by("customer_id")
+        .agg(
+            pl.col("interevent_days").mean().alias("mean_interevent_days"),
+            pl.col("interevent_days").std().alias("std_interevent_days"),
+        )
+        .collect()
+    )
+    expected = {row[0]: row[1:] for row in expected.rows()}
+
+    result = (
+        compute_rfm_features(transactions)
+        .select("customer_id", "mean_interevent_days", "std_interevent_days")
+        .collect()
+    )
+    result = {row[0]: row[1:] for row in result.rows()}
+
+    # One transaction: no interevent times at all
+    assert result[1] == (None, None)
+    # Two transactions: a single gap, so no standard deviation
+    assert result[2] == (3.0, None) == expected[2]
+    # Unsorted input with gaps of 1, 2 and 5 days
+    assert result[3] == pytest.approx(expected[3], abs=1e-12)
+    assert result[3] == pytest.approx((8 / 3, (13 / 3) ** 0.5), abs=1e-12)
+    assert 1 not in expected